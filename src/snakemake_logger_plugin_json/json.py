@@ -2,10 +2,21 @@
 """
 
 import json
-from typing import Any, Iterable, Iterator, Mapping, TypeAlias, get_args
+from io import StringIO
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Mapping, TypeAlias, get_args
 from dataclasses import dataclass
 
-from .models import JsonLogRecord, StandardLogRecord, adapter_cache, META_RECORD_MODELS, SNAKEMAKE_RECORD_MODELS
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+from pydantic_core import to_jsonable_python
+
+from .models import (
+	JsonLogRecord, StandardLogRecord, FormattingErrorRecord, ExceptionInfo, adapter_cache,
+	META_RECORD_MODELS, SNAKEMAKE_RECORD_MODELS,
+)
 
 
 #
@@ -14,6 +25,11 @@ JsonData: TypeAlias = str | bytes | bytearray
 JSON_DATA_TYPES: tuple[type, ...] = get_args(JsonData)
 
 
+#: Decode JSON data, using orjson if available. orjson.JSONDecodeError is a subclass of
+#: json.JSONDecodeError so callers only need to catch the latter.
+_loads: Callable[[JsonData], Any] = json.loads if orjson is None else orjson.loads
+
+
 @dataclass
 class JsonParseError(ValueError):
 
@@ -30,9 +46,28 @@ class JsonParseError(ValueError):
 #                                         Parse log records                                        #
 # ------------------------------------------------------------------------------------------------ #
 
+#: Maps values of the "type" and "event" properties of record JSON to model classes (event is None
+#: for standard records).
+_RECORD_MODEL_TABLE: dict[tuple[str, str | None], type[JsonLogRecord]] = {
+	('standard', None): StandardLogRecord,
+	**{('meta', event): model for event, model in META_RECORD_MODELS.items()},
+	**{('snakemake', event.value): model for event, model in SNAKEMAKE_RECORD_MODELS.items()},
+}
+
+
 def _get_record_model(obj: Mapping[str, Any]) -> type[JsonLogRecord]:
 	"""Determine the specific log record model class from parsed JSON data."""
 
+	try:
+		return _RECORD_MODEL_TABLE[obj.get('type'), obj.get('event')]
+	except (KeyError, TypeError):
+		# Missing/invalid value (or unhashable), find the reason
+		return _get_record_model_checked(obj)
+
+
+def _get_record_model_checked(obj: Mapping[str, Any]) -> type[JsonLogRecord]:
+	"""Slow version of :func:`_get_record_model` which raises an informative error on failure."""
+
 	# Get base type
 	if 'type' not in obj:
 		raise JsonParseError('Record JSON missing "type" property', data=obj)
@@ -75,19 +110,97 @@ def logrecord_from_json(data: JsonData | Mapping[str, Any]) -> JsonLogRecord:
 	"""
 
 	if isinstance(data, JSON_DATA_TYPES):
-		obj = json.loads(data)
+		obj = _loads(data)
 		if not isinstance(obj, dict):
 			raise ValueError('Parsed JSON value is not an object')
+	elif isinstance(data, dict):
+		obj = data
 	elif isinstance(data, Mapping):
 		obj = dict(data)
 	else:
 		raise TypeError('Expected JSON-encoded string/bytes or a mapping object')
 
 	model = _get_record_model(obj)
-	obj.pop('type', None)
-	obj.pop('event', None)
-	obj.pop('levelname', None)
-	return adapter_cache.validate_python(model, obj)
+	# The "type", "event", and "levelname" properties are ignored by the model
+	return model._adapter.validate_python(obj)
+
+
+# ------------------------------------------------------------------------------------------------ #
+#                                        Write log records                                         #
+# ------------------------------------------------------------------------------------------------ #
+
+def logrecord_to_json(record: JsonLogRecord, multiline: bool = False) -> bytes:
+	"""Encode a log record as JSON.
+
+	Uses orjson to encode the output of :meth:`.JsonLogRecord.to_dict` if it is installed,
+	otherwise falls back to the Pydantic serializer.
+
+	Parameters
+	----------
+	record
+		Record to encode.
+	multiline
+		Indent the output over multiple lines. Otherwise the result is a single line, suitable for
+		JSONL.
+	"""
+
+	if orjson is None:
+		return adapter_cache.dump_json(record, indent=2 if multiline else None)
+
+	return _orjson_dumps(record, _orjson_option(multiline))
+
+
+def write_logfile(records: Iterable[JsonLogRecord], file: BinaryIO, multiline: bool = False) -> None:
+	"""Write log records to a file, one after the other.
+
+	The output can be read back with :func:`parse_logfile`. This is more efficient than calling
+	:func:`logrecord_to_json` for each record.
+
+	Parameters
+	----------
+	records
+		Records to write.
+	file
+		File object opened in binary mode.
+	multiline
+		Write each record in indented multi-line format instead of JSONL.
+	"""
+
+	write = file.write
+
+	if orjson is None:
+		for record in records:
+			write(logrecord_to_json(record, multiline=multiline))
+			write(b'\n')
+		return
+
+	option = _orjson_option(multiline) | orjson.OPT_APPEND_NEWLINE
+	for record in records:
+		write(_orjson_dumps(record, option))
+
+
+def _orjson_option(multiline: bool) -> int:
+	"""Get orjson option flags for encoding records."""
+	# Datetimes are passed to the default function so they are formatted the same as by Pydantic
+	option = orjson.OPT_PASSTHROUGH_DATETIME
+	if multiline:
+		option |= orjson.OPT_INDENT_2
+	return option
+
+
+def _orjson_dumps(record: JsonLogRecord, option: int) -> bytes:
+	"""Encode a record with orjson, giving the same result as the Pydantic serializer."""
+	try:
+		return orjson.dumps(record.to_dict(), default=to_jsonable_python, option=option)
+
+	except orjson.JSONEncodeError:
+		# Values orjson can't encode even with the default function (non-string dict keys,
+		# integers outside the 64-bit range). Fall back to the slower Pydantic serializer, which
+		# raises its own error if the value really can't be encoded.
+		data = adapter_cache.dump_json(record, indent=2 if option & orjson.OPT_INDENT_2 else None)
+		if option & orjson.OPT_APPEND_NEWLINE:
+			data += b'\n'
+		return data
 
 
 # ------------------------------------------------------------------------------------------------ #
@@ -113,7 +226,7 @@ class JsonObjectParser:
 
 	def __init__(self):
 		self.current_line = 0
-		self._current_obj: list[str] = []
+		self._current_obj: StringIO | None = None
 		self._current_started = 0
 
 	def process_line(self, line: str) -> _ObjParseResult | None:
@@ -124,18 +237,18 @@ class JsonObjectParser:
 		line = line.rstrip()
 
 		# Skip blank lines
-		if line.isspace():
+		if not line:
 			return None
 
 		# Already in the middle of a multi-line object?
-		if self._current_obj:
-			self._current_obj.append(line)
+		if self._current_obj is not None:
+			self._current_obj.write(line)
 
 			# Object completed?
 			if line == '}':
-				data = ''.join(self._current_obj)
+				data = self._current_obj.getvalue()
 				try:
-					value = json.loads(data)
+					value = _loads(data)
 				except json.JSONDecodeError as exc:
 					raise JsonParseError(
 						str(exc),
@@ -144,7 +257,7 @@ class JsonObjectParser:
 					) from exc
 
 				rval = (self._current_started, self.current_line, value)
-				self._current_obj = []
+				self._current_obj = None
 				self._current_started = 0
 				return rval
 
@@ -152,14 +265,15 @@ class JsonObjectParser:
 
 		# Starting a new multi-line object?
 		if line == '{':
-			self._current_obj = [line]
+			self._current_obj = StringIO()
+			self._current_obj.write(line)
 			self._current_started = self.current_line
 			return
 
 		# Otherwise expect complete object on single line
 		if line.startswith('{'):
 			try:
-				value = json.loads(line)
+				value = _loads(line)
 			except json.JSONDecodeError:
 				pass
 			else:
@@ -184,7 +298,7 @@ class JsonObjectParser:
 
 		This will raise an exception if the final JSON object has not been concluded.
 		"""
-		if self._current_obj:
+		if self._current_obj is not None:
 			raise JsonParseError(
 				f'JSON object starting on line {self._current_started} not closed',
 				start_line=self._current_started,
@@ -192,10 +306,67 @@ class JsonObjectParser:
 			)
 
 
-def parse_logfile(lines: Iterable[str]) -> Iterator[JsonLogRecord]:
+def parse_logfile(lines: Iterable[str], strict: bool = False) -> Iterator[JsonLogRecord]:
+	"""Lazily parse log records from the lines of a log file.
+
+	Accepts the same formats as :class:`JsonObjectParser`.
+
+	Parameters
+	----------
+	lines
+		Lines of the log file.
+	strict
+		Raise an exception if a JSON object in the file is not a valid log record. Otherwise such
+		objects are returned as :class:`.FormattingErrorRecord` instances containing the parsed
+		data, so that one bad record does not prevent reading the rest of the file. Malformed JSON
+		always raises an exception.
+	"""
 	parser = JsonObjectParser()
+	lines = iter(lines)
+
+	def to_record(obj: dict[str, Any]) -> JsonLogRecord:
+		try:
+			return logrecord_from_json(obj)
+		except ValueError as exc:
+			if strict:
+				raise
+			return _invalid_record(obj, exc)
+
+	# Fast path for JSONL format, skips the parser's state machine as long as each line is a
+	# complete object
+	for line in lines:
+		line = line.rstrip()
+		if line.startswith('{') and line.endswith('}'):
+			try:
+				obj = _loads(line)
+			except json.JSONDecodeError:
+				obj = None
+			if isinstance(obj, dict):
+				parser.current_line += 1
+				yield to_record(obj)
+				continue
+
+		# Otherwise hand this and all remaining lines to the parser
+		result = parser.process_line(line)
+		if result is not None:
+			yield to_record(result[2])
+		break
 
 	for l1, l2, obj in parser.process_lines(lines):
-		yield logrecord_from_json(obj)
+		yield to_record(obj)
 
 	parser.complete()
+
+
+def _invalid_record(obj: dict[str, Any], exc: Exception) -> FormattingErrorRecord:
+	"""Wrap the parsed JSON of a record which failed validation."""
+	record = FormattingErrorRecord(
+		record_partial=obj,
+		exception=ExceptionInfo.from_exception(exc),
+		message='Invalid log record',
+	)
+	# Keep the original timestamp if there is one
+	created = obj.get('created')
+	if isinstance(created, (int, float)):
+		record.created = created
+	return record
@@ -1,8 +1,9 @@
-from typing import Optional
+from typing import Optional, BinaryIO
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime
 import os
+import threading
 
 from pydantic import TypeAdapter
 from snakemake_interface_logger_plugins.base import LogHandlerBase
@@ -10,8 +11,8 @@ from snakemake_interface_logger_plugins.settings import LogHandlerSettingsBase
 
 from .models import (
 	JsonLogRecord, FormattingErrorRecord, LoggingStartedRecord, LoggingFinishedRecord,
-	adapter_cache,
 )
+from .json import logrecord_to_json
 
 
 def make_logfile_path(workdir: os.PathLike | None = None, timestamp: datetime | None = None) -> str:
@@ -55,35 +56,127 @@ class JsonFormatter:
 		Write each record over multiple lines with indentation and nice formatting. Easier for a
 		human to read but harder to parse. The alternative is JSONL format.
 	validate
-		Validate the record's attributes.
+		Validate the record's attributes with Pydantic when converting from builtin log records.
+		Slower, but guarantees the attribute values are of the expected types.
 	"""
 
 	multiline: bool = False
 	validate: bool = False
 
 	def format(self, record: logging.LogRecord | JsonLogRecord) -> str:
+		return self.format_bytes(record).decode()
+
+	def format_bytes(self, record: logging.LogRecord | JsonLogRecord) -> bytes:
+		"""Format a record as UTF-8 encoded JSON."""
 		json_record = self._get_json_record(record)
-		return self._format_json_record(json_record)
+
+		try:
+			return self._format_json_record(json_record)
+
+		except Exception as exc:
+			# Without validation, unexpected attribute values are only caught when serializing
+			if not isinstance(record, logging.LogRecord):
+				raise
+			return self._format_json_record(self._make_error_record(record, exc))
 
 	def _get_json_record(self, record: logging.LogRecord | JsonLogRecord) -> JsonLogRecord:
-		if isinstance(record, JsonLogRecord):
+		# Check this first, isinstance() is slower for JsonLogRecord (an ABC)
+		if not isinstance(record, logging.LogRecord):
 			return record
 
 		try:
-			return JsonLogRecord.from_builtin(record)
+			return JsonLogRecord.from_builtin(record, validate=self.validate)
 
 		except Exception as exc:
 			return self._make_error_record(record, exc)
 
-	def _format_json_record(self, json_record: JsonLogRecord) -> str:
-		data = adapter_cache.dump_json(json_record, indent=2 if self.multiline else None)
-		return data.decode()
+	def _format_json_record(self, json_record: JsonLogRecord) -> bytes:
+		return logrecord_to_json(json_record, multiline=self.multiline)
 
 	def _make_error_record(self, record: logging.LogRecord, exc: Exception) -> FormattingErrorRecord:
 		return FormattingErrorRecord.create(record, exc)
 
 
+class JsonFileWriter(logging.Handler):
+	"""Handler which writes JSON-formatted records to a file opened in binary mode.
+
+	Unlike :class:`logging.FileHandler` the encoded JSON is written directly without a round trip
+	through :class:`str`, and the file is not flushed after each record. Instead it is flushed
+	once :attr:`FLUSH_RECORDS` records have been written since the last flush, by a timer
+	:attr:`FLUSH_INTERVAL` seconds after the first record written since the last flush (so records
+	are not held back while the workflow is idle), and on :meth:`flush` and :meth:`close`.
+
+	Attributes
+	----------
+	json_formatter
+		Formatter used to encode records.
+	file
+		Buffered file object records are written to.
+	"""
+
+	#: Buffer size of the output file.
+	BUFFER_SIZE = 1 << 16
+	#: Maximum number of records written between flushes.
+	FLUSH_RECORDS = 100
+	#: Maximum time in seconds a record is left in the buffer before being flushed.
+	FLUSH_INTERVAL = 1.0
+
+	json_formatter: JsonFormatter
+	file: BinaryIO
+
+	def __init__(self, path: str, formatter: JsonFormatter):
+		super().__init__()
+		self.json_formatter = formatter
+		self.file = open(path, 'wb', buffering=self.BUFFER_SIZE)
+		self._unflushed = 0
+		self._timer: threading.Timer | None = None
+
+	def emit(self, record):
+		try:
+			self.file.write(self.json_formatter.format_bytes(record))
+			self.file.write(b'\n')
+		except Exception:
+			self.handleError(record)
+			return
+
+		self._unflushed += 1
+		if self._unflushed >= self.FLUSH_RECORDS:
+			self.flush()
+		elif self._timer is None:
+			self._timer = threading.Timer(self.FLUSH_INTERVAL, self.flush)
+			self._timer.daemon = True
+			self._timer.start()
+
+	def flush(self):
+		with self.lock:
+			self._cancel_timer()
+			if not self.file.closed:
+				self.file.flush()
+			self._unflushed = 0
+
+	def close(self):
+		with self.lock:
+			self._cancel_timer()
+			self.file.close()
+		super().close()
+
+	def _cancel_timer(self) -> None:
+		if self._timer is not None:
+			self._timer.cancel()
+			self._timer = None
+
+
 class JsonLogHandler(LogHandlerBase):
+	"""Log handler which writes JSON-formatted records.
+
+	Snakemake already calls :meth:`emit` from its own queue listener thread, so records are
+	formatted and written directly.
+
+	Attributes
+	----------
+	handler
+		Handler which formats and writes the records.
+	"""
 
 	settings: JsonLogHandlerSettings
 	baseFilename: str | None
@@ -94,9 +187,12 @@ class JsonLogHandler(LogHandlerBase):
 		LogHandlerBase.__init__(self, *args)
 
 	def __post_init__(self) -> None:
+		formatter = JsonFormatter(multiline=self.settings.multiline, validate=self.settings.validate)
+
 		if self.settings.file == '-':
 			self.baseFilename = None
 			self.handler = logging.StreamHandler()
+			self.handler.setFormatter(formatter)  # type: ignore
 
 		else:
 			if self.settings.file:
@@ -105,19 +201,15 @@ class JsonLogHandler(LogHandlerBase):
 				self.baseFilename = make_logfile_path()
 				os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
 
-			self.handler = logging.FileHandler(self.baseFilename, mode='w')
-
-		formatter = JsonFormatter(multiline=self.settings.multiline, validate=self.settings.validate)
-		self.handler.setFormatter(formatter)  # type: ignore
+			self.handler = JsonFileWriter(self.baseFilename, formatter)
 
-		start = LoggingStartedRecord(pid=os.getpid())
-		self.handler.emit(start)  # type: ignore
+		self.handler.handle(LoggingStartedRecord(pid=os.getpid()))  # type: ignore
 
 	def emit(self, record):
-		self.handler.emit(record)
+		self.handler.handle(record)
 
 	def close(self):
-		self.handler.emit(LoggingFinishedRecord())  # type: ignore
+		self.handler.handle(LoggingFinishedRecord())  # type: ignore
 		self.handler.close()
 
 	def flush(self):
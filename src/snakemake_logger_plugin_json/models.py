@@ -1,13 +1,16 @@
 """Classes used to represent log records."""
 
+from abc import ABC, abstractmethod
 from datetime import datetime
 import logging
 from typing import (
 	Any, Callable, NoReturn, Self, TypeVar, ClassVar, Literal, TypeAlias, dataclass_transform,
 )
 from uuid import UUID
-from dataclasses import dataclass, field, fields, Field, MISSING
+from dataclasses import dataclass, field, fields, MISSING
 import time
+import warnings
+from weakref import WeakKeyDictionary
 from pathlib import PurePath
 
 from pydantic import TypeAdapter, ConfigDict, model_serializer, SerializerFunctionWrapHandler
@@ -22,24 +25,52 @@ _T_modeltype = TypeVar('_T_modeltype', bound=type['JsonLogRecord'])
 RecordType: TypeAlias = Literal['standard', 'meta', 'snakemake']
 
 
-NAMED_LEVELS = (logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL)
+#: Names of the standard logging levels.
+LEVEL_NAMES: dict[int, str] = {
+	level: logging.getLevelName(level)
+	for level in (logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL)
+}
 
 
 def make_registration_decorator(
 	registry: dict[Any, Any],
 	attrname: str,
 ) -> Callable[[_T_modeltype], _T_modeltype]:
+	"""Create a decorator which registers a model class under the value of one of its attributes.
+
+	The decorator also performs setup for the model class, see :meth:`JsonLogRecord._init_class`.
+	"""
 
 	def register(cls: _T_modeltype) -> _T_modeltype:
 		key = getattr(cls, attrname)
 		if key in registry:
 			raise ValueError(f'Model already registered for key {key!r}')
 		registry[key] = cls
+		cls._init_class()
 		return cls
 
 	return register
 
 
+def _create_method(cls: type, name: str, lines: list[str], namespace: dict[str, Any]) -> Callable:
+	"""Compile a function from lines of source code, to be used as a method of ``cls``.
+
+	The values in ``namespace`` are bound as closure variables of the function rather than as
+	globals, so referencing them does not require a dict lookup. This is the same technique used by
+	the :mod:`dataclasses` module.
+	"""
+	source = '\n'.join([
+		f'def __create_fn__({", ".join(namespace)}):',
+		*('\t' + line for line in lines),
+		f'\treturn {name}',
+	])
+	local_ns: dict[str, Any] = {}
+	exec(source, {}, local_ns)
+	func = local_ns['__create_fn__'](**namespace)
+	func.__qualname__ = f'{cls.__qualname__}.{name}'
+	return func
+
+
 class TypeAdapterCache:
 	"""Caches Pydantic TypeAdapters.
 
@@ -87,7 +118,12 @@ adapter_cache = TypeAdapterCache()
 #                                         Non-record models                                        #
 # ------------------------------------------------------------------------------------------------ #
 
-@dataclass
+#: Cache of qualified exception type names used by ExceptionInfo.from_exception(). Weak keys so
+#: dynamically created exception classes can still be garbage collected.
+_EXC_TYPESTR_CACHE: WeakKeyDictionary[type, str] = WeakKeyDictionary()
+
+
+@dataclass(slots=True, frozen=True)
 class ExceptionInfo:
 	"""Information from a caught exception."""
 
@@ -97,9 +133,12 @@ class ExceptionInfo:
 	@staticmethod
 	def from_exception(exc: BaseException) -> 'ExceptionInfo':
 		typ = type(exc)
-		typestr = type.__qualname__
-		if typ.__module__ not in (None, 'builtins'):
-			typestr = f'{typ.__module__}.{typestr}'
+		typestr = _EXC_TYPESTR_CACHE.get(typ)
+		if typestr is None:
+			typestr = typ.__qualname__
+			if typ.__module__ not in (None, 'builtins'):
+				typestr = f'{typ.__module__}.{typestr}'
+			_EXC_TYPESTR_CACHE[typ] = typestr
 		return ExceptionInfo(message=str(exc), type=typestr)
 
 
@@ -107,8 +146,8 @@ class ExceptionInfo:
 #                                               Base                                               #
 # ------------------------------------------------------------------------------------------------ #
 
-@dataclass(kw_only=True)
-class JsonLogRecord:
+@dataclass(kw_only=True, slots=True)
+class JsonLogRecord(ABC):
 	"""Base class for models of a JSON-formatted log records.
 
 	Can be constructed from builtin :class:`logging.LogRecord` instances using the
@@ -126,21 +165,43 @@ class JsonLogRecord:
 		Timestamp when log record was created.
 	"""
 
-	# __pydantic_config__: ClassVar = ConfigDict(extra='forbid')
+	# Ignore extra keys when validating, this includes the type/event/levelname properties added
+	# by the serializer
+	__pydantic_config__: ClassVar = ConfigDict(extra='ignore')
 
-	type: ClassVar[RecordType]
+	#: Pydantic adapter for this specific class, built once when the class is defined
+	_adapter: ClassVar[TypeAdapter]
+	#: Leading keys of serialized record which only depend on the class
+	_serial_prefix: ClassVar[dict[str, str]]
 
 	message: str | None
 	levelno: int
-	# This is how the Python documentation says LogRecord.created is set, unsure how it's supposed
-	# to be different than time.time()
+	# The Python documentation says LogRecord.created is set from time.time_ns() / 1e9, but
+	# time.time() is equivalent at float precision and avoids a Python-level call per record. Only
+	# used for meta records, otherwise this comes from the builtin record.
 	# https://docs.python.org/3/library/logging.html#logrecord-attributes
-	created: float = field(default_factory=lambda: time.time_ns() / 1e9)
+	created: float = field(default_factory=time.time)
 	exc_info: ExceptionInfo | None = None
 
-	def __init__(self, *args, **kw):
-		# This will be overwritten in any child classes with a @dataclass decorator
-		raise TypeError(f"Can't instantiate abstract class {self.__class__.__name__}")
+	# Abstract, overridden with a plain class attribute in subclasses
+	@property
+	@abstractmethod
+	def type(self) -> RecordType:
+		...
+
+	@classmethod
+	def _init_class(cls) -> None:
+		"""Perform setup for a concrete model class after it has been defined.
+
+		Creates the TypeAdapter for the class and stores it in :attr:`_adapter` (this is shared with
+		:data:`adapter_cache`), sets :attr:`_serial_prefix`, and replaces :meth:`to_dict` with a
+		version specialized to the class.
+		"""
+		cls._adapter = adapter_cache.get(cls)
+		cls._serial_prefix = {'type': cls.type}
+		if hasattr(cls, 'event'):
+			cls._serial_prefix['event'] = str(cls.event)
+		cls.to_dict = _make_to_dict(cls)
 
 	@property
 	def created_dt(self) -> datetime:
@@ -153,38 +214,41 @@ class JsonLogRecord:
 
 		This is always determined from :attr:`levelno`, so no need to store as an actual attribute.
 		"""
-		return logging.getLevelName(self.levelno)
+		return LEVEL_NAMES.get(self.levelno) or logging.getLevelName(self.levelno)
 
 	@staticmethod
-	def from_builtin(record: logging.LogRecord) -> 'JsonLogRecord':
+	def from_builtin(record: logging.LogRecord, validate: bool = False) -> 'JsonLogRecord':
 		"""Construct a log record model from a builtin :class:`logging.LogRecord` instance.
 
 		Parameters
 		----------
 		record
 			Log record instance from the standard logging system.
+		validate
+			Validate and convert attribute values with Pydantic. Otherwise the model is constructed
+			from them directly, which is much faster.
 
 		Returns
 		-------
 		JsonLogRecord
 			An instance of a suitable subclass of :class:`JsonLogRecord`.
 		"""
-		event = getattr(record, 'event', None)
-		if isinstance(event, LogEvent):
-			cls = SNAKEMAKE_RECORD_MODELS[event]
-			return cls._from_builtin(record)
-		else:
-			return StandardLogRecord._from_builtin(record)
+		# Records without a LogEvent event attribute are standard records. Check the exact type
+		# because LogEvent is a str enum, so plain strings would also match the registry keys.
+		event = record.__dict__.get('event')
+		cls = SNAKEMAKE_RECORD_MODELS[event] if type(event) is LogEvent else StandardLogRecord
+		return cls._from_builtin(record, validate)
 
 	@classmethod
-	def _from_builtin(cls, record: logging.LogRecord) -> Self:
+	def _from_builtin(cls, record: logging.LogRecord, validate: bool = False) -> Self:
 		"""This is specialized to the particular subclass.
 
 		Assumes the passed record matches the class.
 		"""
 		attrs = cls._get_attrs(record)
-		# return cls(**attrs)
-		return adapter_cache.validate_python(cls, attrs)
+		if validate:
+			return cls._adapter.validate_python(attrs)
+		return cls(**attrs)
 
 	@classmethod
 	def _get_attrs(cls, record: logging.LogRecord) -> dict[str, Any]:
@@ -211,30 +275,72 @@ class JsonLogRecord:
 		kw.setdefault('created', self.created)
 		return logging.makeLogRecord(kw)
 
-	@model_serializer(mode='wrap')
-	def _serialize(self, handler: SerializerFunctionWrapHandler):
-		# Set these first so they appear at the of the record in multiline format, for easier reading
+	def to_dict(self) -> dict[str, Any]:
+		"""Get the record's JSON representation as a dictionary.
+
+		This has the same properties as the output of the Pydantic serializer, but attribute values
+		are not converted to JSON-compatible types. This is much faster when using an encoder
+		which handles the conversion itself, like orjson.
+		"""
+		# Generic version, replaced with an equivalent generated method in concrete classes
 		d: dict[str, Any] = dict(type=self.type)
 		if hasattr(self, 'event'):
 			d['event'] = str(self.event)
-		# Add this just for human readability
-		d['levelname'] = logging.getLevelName(self.levelno) if self.levelno in NAMED_LEVELS else None
-		d |= handler(self)
-		if d['exc_info'] is None:
+		d['levelname'] = LEVEL_NAMES.get(self.levelno)
+		for field in fields(self):
+			d[field.name] = getattr(self, field.name)
+		if self.exc_info is None:
 			del d['exc_info']
 		return d
 
+	@model_serializer(mode='wrap')
+	def _serialize(self, handler: SerializerFunctionWrapHandler):
+		attrs = handler(self)
+		if attrs['exc_info'] is None:
+			del attrs['exc_info']
+		# Put these first so they appear at the of the record in multiline format, for easier
+		# reading. levelname is just for human readability.
+		return {**self._serial_prefix, 'levelname': LEVEL_NAMES.get(self.levelno), **attrs}
+
 
 _BASE_FIELDNAMES = {field.name for field in fields(JsonLogRecord)}
 
 
-@dataclass(kw_only=True)
+def _make_to_dict(cls: type[JsonLogRecord]) -> Callable:
+	"""Generate a version of :meth:`JsonLogRecord.to_dict` specialized to a concrete class.
+
+	The class-dependent keys are inserted as constants, and the dict is built in a single
+	expression.
+	"""
+	items = [f"'type': {cls.type!r}"]
+	if hasattr(cls, 'event'):
+		items.append(f"'event': {str(cls.event)!r}")
+	items.append("'levelname': _get_levelname(self.levelno)")
+	for field in fields(cls):
+		items.append(f'{field.name!r}: self.{field.name}')
+
+	lines = [
+		'def to_dict(self):',
+		'\td = {' + ', '.join(items) + '}',
+		'\tif self.exc_info is None:',
+		"\t\tdel d['exc_info']",
+		'\treturn d',
+	]
+	return _create_method(cls, 'to_dict', lines, {'_get_levelname': LEVEL_NAMES.get})
+
+
+@dataclass(kw_only=True, slots=True)
 class StandardLogRecord(JsonLogRecord):
 	"""A standard Python log record."""
 
 	type = 'standard'
 
 
+StandardLogRecord._init_class()
+
+_STANDARD_FIELDNAMES = tuple(field.name for field in fields(StandardLogRecord))
+
+
 # ------------------------------------------------------------------------------------------------ #
 #                                               Meta                                               #
 # ------------------------------------------------------------------------------------------------ #
@@ -245,7 +351,7 @@ META_RECORD_MODELS: dict[str, type['MetaLogRecord']] = dict()
 register_meta_model = make_registration_decorator(META_RECORD_MODELS, 'event')
 
 
-@dataclass(kw_only=True, init=False)
+@dataclass(kw_only=True, slots=True)
 class MetaLogRecord(JsonLogRecord):
 	"""Log record containing information about the logging session itself.
 
@@ -258,14 +364,19 @@ class MetaLogRecord(JsonLogRecord):
 	"""
 
 	type = 'meta'
-	event: ClassVar[str]
+
+	# Abstract, overridden with a plain class attribute in subclasses
+	@property
+	@abstractmethod
+	def event(self) -> str:
+		...
 
 	@staticmethod
 	def _builtin_error() -> NoReturn:
 		raise TypeError('MetaLogRecord subclasses cannot be constructed from builtin log records')
 
 	@classmethod
-	def _from_builtin(cls, record: logging.LogRecord):
+	def _from_builtin(cls, record: logging.LogRecord, validate: bool = False):
 		cls._builtin_error()
 
 	@classmethod
@@ -274,7 +385,7 @@ class MetaLogRecord(JsonLogRecord):
 
 
 @register_meta_model
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class LoggingStartedRecord(MetaLogRecord):
 	"""Indicates the initialization of the logging system.
 
@@ -296,7 +407,7 @@ class LoggingStartedRecord(MetaLogRecord):
 
 
 @register_meta_model
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class LoggingFinishedRecord(MetaLogRecord):
 	"""Indicates that the logging system has shut down and closed successfully.
 	"""
@@ -308,7 +419,7 @@ class LoggingFinishedRecord(MetaLogRecord):
 
 
 @register_meta_model
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FormattingErrorRecord(MetaLogRecord):
 	"""Indicates an error formatting a log record.
 
@@ -365,11 +476,8 @@ class FormattingErrorRecord(MetaLogRecord):
 
 	@staticmethod
 	def _extract_partial(record: logging.LogRecord) -> dict[str, Any]:
-		attrs = {}
-		for field in fields(StandardLogRecord):
-			if hasattr(record, field.name):
-				attrs[field.name] = getattr(record, field.name)
-		return attrs
+		record_dict = record.__dict__
+		return {name: record_dict[name] for name in _STANDARD_FIELDNAMES if name in record_dict}
 
 
 # ------------------------------------------------------------------------------------------------ #
@@ -386,20 +494,65 @@ register_snakemake_model = make_registration_decorator(SNAKEMAKE_RECORD_MODELS,
 def snakemake_model(register: bool = True):
 	"""Decorator to apply to a child of :class:`.SnakemakeLogRecord`.
 
-	This applies the dataclass decorator, registers it based on event type, and sets the
-	``_extra_fields`` class attribute.
+	This applies the dataclass decorator, sets the ``_extra_fieldnames`` and
+	``_required_fieldnames`` class attributes, replaces ``_get_attrs`` with a version specialized to
+	the class (see :func:`_make_get_attrs`), and registers it based on event type. Class setup (see
+	:meth:`JsonLogRecord._init_class`) is performed whether or not the class is registered.
 	"""
 
 	def decorator(cls):
-		dataclass(cls, kw_only=True)
+		cls = dataclass(cls, kw_only=True, slots=True)
+		extra_fields = [field for field in fields(cls) if field.name not in _BASE_FIELDNAMES]
+		cls._extra_fieldnames = tuple(field.name for field in extra_fields)
+		cls._required_fieldnames = frozenset(
+			field.name for field in extra_fields
+			if field.default is MISSING and field.default_factory is MISSING
+		)
+		if '_get_attrs' not in cls.__dict__:
+			cls._get_attrs = classmethod(_make_get_attrs(cls))
 		if register:
 			register_snakemake_model(cls)
-		cls._extra_fields = tuple(field for field in fields(cls) if field.name not in _BASE_FIELDNAMES)
+		else:
+			cls._init_class()
 		return cls
 
 	return decorator
 
 
+def _make_get_attrs(cls: type['SnakemakeLogRecord']) -> Callable:
+	"""Generate a version of :meth:`SnakemakeLogRecord._get_attrs` specialized to a subclass.
+
+	The generated function reads each of the class's extra attributes with straight-line code
+	rather than looping over the field names, similar to how the dataclass ``__init__`` is created.
+	"""
+	namespace: dict[str, Any] = {'_base_get_attrs': JsonLogRecord._get_attrs.__func__}
+	lines = [
+		'def _get_attrs(cls, record):',
+		'\tattrs = _base_get_attrs(cls, record)',
+		'\trecord_dict = record.__dict__',
+	]
+
+	for name in cls._extra_fieldnames:
+		lines.append(f'\tif {name!r} in record_dict:')
+
+		if name in cls._converters:
+			convname = f'_convert_{name}'
+			namespace[convname] = cls._converters[name]
+			lines.append(f'\t\tvalue = record_dict[{name!r}]')
+			lines.append(f'\t\tattrs[{name!r}] = value if value is None else {convname}(value)')
+		else:
+			lines.append(f'\t\tattrs[{name!r}] = record_dict[{name!r}]')
+
+		if name in cls._required_fieldnames:
+			msg = f'LogRecord with event type {cls.event} missing required attribute {name!r}'
+			lines.append('\telse:')
+			lines.append(f'\t\traise AttributeError({msg!r})')
+
+	lines.append('\treturn attrs')
+
+	return _create_method(cls, '_get_attrs', lines, namespace)
+
+
 class SnakemakeLogRecord(JsonLogRecord):
 	"""Base class for a Snakemake log record model.
 
@@ -409,25 +562,47 @@ class SnakemakeLogRecord(JsonLogRecord):
 		The Snakemake log event type (class attribute).
 	"""
 
+	__slots__ = ()
+
 	type = 'snakemake'
-	event: ClassVar[LogEvent]
-	_extra_fields: ClassVar[tuple[Field, ...]] = ()
+
+	#: Names of fields not in the base class
+	_extra_fieldnames: ClassVar[tuple[str, ...]] = ()
+	#: Subset of _extra_fieldnames without a default value
+	_required_fieldnames: ClassVar[frozenset[str]] = frozenset()
+	#: Functions applied to non-None attribute values of builtin records, by field name. Used to
+	#: convert to the field's type when the model is constructed without validation.
+	_converters: ClassVar[dict[str, Callable[[Any], Any]]] = {}
+
+	# Abstract, overridden with a plain class attribute in subclasses
+	@property
+	@abstractmethod
+	def event(self) -> LogEvent:
+		...
 
 	@classmethod
 	def _get_attrs(cls, record: logging.LogRecord) -> dict[str, Any]:
+		# Generic version, replaced with an equivalent generated function in subclasses decorated
+		# with snakemake_model()
 		attrs = super()._get_attrs(record)
 
-		for field in cls._extra_fields:
-			if hasattr(record, field.name):
-				attrs[field.name] = getattr(record, field.name)
-			elif field.default is MISSING and field.default_factory is MISSING:
-				raise AttributeError(f'LogRecord with event type {cls.event} missing required attribute {field.name!r}')
+		# LogRecord stores all attributes (including "extra") in the instance dict, this is cheaper
+		# than hasattr()/getattr()
+		record_dict = record.__dict__
+		for name in cls._extra_fieldnames:
+			if name in record_dict:
+				value = record_dict[name]
+				if value is not None and name in cls._converters:
+					value = cls._converters[name](value)
+				attrs[name] = value
+			elif name in cls._required_fieldnames:
+				raise AttributeError(f'LogRecord with event type {cls.event} missing required attribute {name!r}')
 
 		return attrs
 
 	def to_builtin(self, **kw) -> logging.LogRecord:
-		for field in self._extra_fields:
-			kw.setdefault(field.name, getattr(self, field.name))
+		for name in self._extra_fieldnames:
+			kw.setdefault(name, getattr(self, name))
 		kw.setdefault('event', self.event)
 		return super().to_builtin(**kw)
 
@@ -452,9 +627,22 @@ class ErrorRecord(SnakemakeLogRecord):
 class WorkflowStartedRecord(SnakemakeLogRecord):
 	event = LogEvent.WORKFLOW_STARTED
 
-	workflow_id: UUID
-	# snakefile: str | None
-	snakefile: PurePath | None
+	# Stored as strings, converting to/from UUID and PurePath objects on every record is
+	# relatively expensive
+	workflow_id: str
+	snakefile: str | None
+
+	_converters = {'workflow_id': str, 'snakefile': str}
+
+	@property
+	def workflow_uuid(self) -> UUID:
+		"""Workflow ID as a :class:`uuid.UUID` instance."""
+		return UUID(self.workflow_id)
+
+	@property
+	def snakefile_path(self) -> PurePath | None:
+		"""Snakefile as a :class:`pathlib.PurePath` instance."""
+		return None if self.snakefile is None else PurePath(self.snakefile)
 
 
 @snakemake_model()
@@ -472,7 +660,8 @@ class JobInfoRecord(SnakemakeLogRecord):
 	wildcards: dict[str, Any] | None = None
 	reason: str | None = None
 	shellcmd: str | None = None
-	priority: int | None = None
+	# Snakemake uses the string "highest" for jobs with top priority
+	priority: int | str | None = None
 	# resources: dict[str, Any] | None = None
 	resources: dict[str, Any] | list[Any] | None = None
 
@@ -590,9 +779,23 @@ class RunInfoRecord(SnakemakeLogRecord):
 #                                               Misc                                               #
 # ------------------------------------------------------------------------------------------------ #
 
-#: All non-abstract model classes
-ALL_MODELS: list[type[JsonLogRecord]] = [
-	StandardLogRecord,
-	*META_RECORD_MODELS.values(),
-	*SNAKEMAKE_RECORD_MODELS.values(),
-]
+def all_models() -> list[type[JsonLogRecord]]:
+	"""Get all non-abstract model classes, including any registered after this module was loaded.
+	"""
+	return [
+		StandardLogRecord,
+		*META_RECORD_MODELS.values(),
+		*SNAKEMAKE_RECORD_MODELS.values(),
+	]
+
+
+def __getattr__(name: str) -> Any:
+	# Deprecated module attributes
+	if name == 'ALL_MODELS':
+		warnings.warn(
+			'ALL_MODELS is deprecated, use all_models() instead',
+			DeprecationWarning,
+			stacklevel=2,
+		)
+		return all_models()
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -13,13 +13,19 @@ M = TypeVar('M', bound=models.JsonLogRecord)
 RANDOM_TIMESTAMP = 1759974850.185749
 LEVELS = [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR]
 
+# Field names of each model class, cached by make_record()
+_FIELDNAMES_CACHE: dict[type, frozenset[str]] = dict()
+
 
 def make_record(cls: type[M], **kw) -> M:
 	kw.setdefault('message', f'Test {cls}')
 	kw.setdefault('levelno', logging.INFO)
 	kw.setdefault('created', RANDOM_TIMESTAMP)
 
-	fieldnames = {field.name for field in fields(cls)}
+	fieldnames = _FIELDNAMES_CACHE.get(cls)
+	if fieldnames is None:
+		fieldnames = _FIELDNAMES_CACHE[cls] = frozenset(field.name for field in fields(cls))
+
 	for name in kw:
 		if name not in fieldnames:
 			raise ValueError(f'Unknown field: {name!r}')
@@ -70,6 +76,7 @@ def example_records_sm() -> Sequence[models.SnakemakeLogRecord]:
 			input=['in/file1', 'in/file2'],
 			output=['out/file3'],
 			wildcards={'foo': '1'},
+			priority='highest',
 		),
 		factory.make_record(
 			models.JobStartedRecord,
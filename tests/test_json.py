@@ -1,10 +1,56 @@
 import json
+import logging
+from io import BytesIO
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import PurePath
+
+import pytest
 
 import snakemake_logger_plugin_json.json as json_module
 from snakemake_logger_plugin_json import models
 
 
-def test_record_roundtrip(example_records: list[models.JsonLogRecord]):
+@pytest.fixture(params=['orjson', 'stdlib'])
+def json_backend(request, monkeypatch) -> str:
+	"""Run the test with orjson and again with the fallbacks used when it is not installed."""
+	if request.param == 'stdlib':
+		monkeypatch.setattr(json_module, 'orjson', None)
+		monkeypatch.setattr(json_module, '_loads', json.loads)
+	elif json_module.orjson is None:
+		pytest.skip('orjson not installed')
+	return request.param
+
+
+def make_other_value_records() -> list[models.JsonLogRecord]:
+	"""Records with attribute values of types orjson does not support natively.
+
+	These don't round-trip, but should be encoded the same way by both backends.
+	"""
+	values = {
+		'timedelta': timedelta(seconds=1.5),
+		'decimal': Decimal('1.25'),
+		'bytes': b'abc',
+		'bigint': 2 ** 70,
+		'set': {1},
+		'path': PurePath('a/b'),
+		'datetime': datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc),
+	}
+	return [
+		models.JobInfoRecord(
+			message='test',
+			levelno=logging.INFO,
+			jobid=1,
+			rule_name='rule',
+			threads=1,
+			wildcards=values,
+		),
+		models.RulegraphRecord(message='test', levelno=logging.INFO, rulegraph={None: 1, 'a': [2]}),
+	]
+
+
+def test_record_roundtrip(example_records: list[models.JsonLogRecord], json_backend: str):
 	"""Test round-tripping records to JSON."""
 
 	for record in example_records:
@@ -16,3 +62,115 @@ def test_record_roundtrip(example_records: list[models.JsonLogRecord]):
 			parsed = json_module.logrecord_from_json(data)
 			assert type(parsed) is type(record)
 			assert parsed == record
+
+
+def test_logrecord_to_json(example_records: list[models.JsonLogRecord], json_backend: str):
+	"""Test encoding records with logrecord_to_json() and parsing them back again."""
+
+	exc_info = models.ExceptionInfo(message='test', type='ValueError')
+	records = [
+		*example_records,
+		*(replace(record, exc_info=exc_info) for record in example_records),
+	]
+
+	other_records = make_other_value_records()
+
+	for record in [*records, *other_records]:
+		for multiline in [False, True]:
+			encoded = json_module.logrecord_to_json(record, multiline=multiline)
+			assert (b'\n' in encoded) == multiline
+			# Should match output of Pydantic serializer, including key order
+			expected = json.loads(models.adapter_cache.dump_json(record))
+			decoded = json.loads(encoded)
+			assert decoded == expected
+			assert list(decoded) == list(expected)
+			if record not in other_records:
+				parsed = json_module.logrecord_from_json(encoded)
+				assert type(parsed) is type(record)
+				assert parsed == record
+
+
+def test_json_backends_match(example_records: list[models.JsonLogRecord], monkeypatch):
+	"""Test encoding records with and without orjson gives the same result."""
+
+	if json_module.orjson is None:
+		pytest.skip('orjson not installed')
+
+	records = [*example_records, *make_other_value_records()]
+
+	def parse_objects(data: bytes) -> list[dict]:
+		lines = data.decode().splitlines()
+		return [obj for l1, l2, obj in json_module.JsonObjectParser().process_lines(lines)]
+
+	for multiline in [False, True]:
+		with_orjson = [json_module.logrecord_to_json(r, multiline=multiline) for r in records]
+		buf = BytesIO()
+		json_module.write_logfile(records, buf, multiline=multiline)
+		file_with_orjson = buf.getvalue()
+
+		with monkeypatch.context() as m:
+			m.setattr(json_module, 'orjson', None)
+			without_orjson = [json_module.logrecord_to_json(r, multiline=multiline) for r in records]
+			buf = BytesIO()
+			json_module.write_logfile(records, buf, multiline=multiline)
+			file_without_orjson = buf.getvalue()
+
+		for encoded1, encoded2 in zip(with_orjson, without_orjson):
+			assert json.loads(encoded1) == json.loads(encoded2)
+
+		assert parse_objects(file_with_orjson) == parse_objects(file_without_orjson)
+
+
+def test_write_logfile(example_records: list[models.JsonLogRecord], json_backend: str):
+	"""Test writing records with write_logfile() and parsing them with parse_logfile()."""
+
+	for multiline in [False, True]:
+		buf = BytesIO()
+		json_module.write_logfile(example_records, buf, multiline=multiline)
+		lines = buf.getvalue().decode().splitlines()
+		if not multiline:
+			assert len(lines) == len(example_records)
+		assert list(json_module.parse_logfile(lines)) == list(example_records)
+
+
+def test_parse_logfile(example_records: list[models.JsonLogRecord], json_backend: str):
+	"""Test parse_logfile() with blank lines and a mix of single- and multi-line records."""
+
+	# JSONL, then multi-line, then JSONL again
+	n = len(example_records) // 3
+	lines = []
+	for i, record in enumerate(example_records):
+		multiline = n <= i < 2 * n
+		encoded = json_module.logrecord_to_json(record, multiline=multiline)
+		lines.extend(encoded.decode().splitlines())
+		lines.extend(['', '  '] if i % 2 else [''])
+
+	assert list(json_module.parse_logfile(lines)) == list(example_records)
+
+	# Check line numbers are still correct after switching formats
+	with pytest.raises(json_module.JsonParseError) as excinfo:
+		list(json_module.parse_logfile([*lines, '{', '  "type": "standard",']))
+	assert excinfo.value.start_line == len(lines) + 1
+	assert excinfo.value.end_line == len(lines) + 2
+
+
+def test_parse_logfile_invalid(json_backend: str):
+	"""Test parse_logfile() with a record that fails validation."""
+
+	valid = models.ProgressRecord(message='test', levelno=logging.INFO, created=1., done=1, total=2)
+	invalid = {**valid.to_dict(), 'done': 'foo'}
+	lines = [
+		json_module.logrecord_to_json(valid).decode(),
+		json.dumps(invalid),
+		json_module.logrecord_to_json(valid).decode(),
+	]
+
+	parsed = list(json_module.parse_logfile(lines))
+	assert parsed[0] == parsed[2] == valid
+	assert isinstance(parsed[1], models.FormattingErrorRecord)
+	assert parsed[1].record_partial == invalid
+	assert parsed[1].created == valid.created
+	assert parsed[1].exception is not None
+
+	with pytest.raises(ValueError):
+		list(json_module.parse_logfile(lines, strict=True))
@@ -2,8 +2,11 @@ from typing import Sequence
 import logging
 from pathlib import Path
 import os
+import time
 
-from snakemake_logger_plugin_json.logger import JsonLogHandlerSettings, JsonLogHandler
+from snakemake_logger_plugin_json.logger import (
+	JsonLogHandlerSettings, JsonLogHandler, JsonFileWriter, JsonFormatter,
+)
 from snakemake_logger_plugin_json import models
 from snakemake_logger_plugin_json.json import parse_logfile
 
@@ -48,3 +51,35 @@ def test_logging(
 	# Check emitted records
 	for i, record in enumerate(records):
 		assert parsed[i + 1] == record
+
+
+def test_file_writer_flush(tmp_path: Path):
+	"""Test JsonFileWriter flushes in batches of records, when idle, and on flush()."""
+
+	logfile = tmp_path / 'log'
+	writer = JsonFileWriter(str(logfile), JsonFormatter())
+	writer.FLUSH_INTERVAL = 60
+
+	for i in range(writer.FLUSH_RECORDS - 1):
+		writer.handle(models.LoggingFinishedRecord())  # type: ignore
+	assert logfile.read_bytes() == b''
+
+	writer.handle(models.LoggingFinishedRecord())  # type: ignore
+	assert logfile.read_bytes().count(b'\n') == writer.FLUSH_RECORDS
+
+	writer.handle(models.LoggingFinishedRecord())  # type: ignore
+	writer.flush()
+	assert logfile.read_bytes().count(b'\n') == writer.FLUSH_RECORDS + 1
+
+	# Records written before going idle are flushed by the timer
+	writer.FLUSH_INTERVAL = .1
+	writer.handle(models.LoggingFinishedRecord())  # type: ignore
+	writer.handle(models.LoggingFinishedRecord())  # type: ignore
+	assert logfile.read_bytes().count(b'\n') == writer.FLUSH_RECORDS + 1
+
+	deadline = time.monotonic() + 10
+	while logfile.read_bytes().count(b'\n') < writer.FLUSH_RECORDS + 3:
+		assert time.monotonic() < deadline, 'Records not flushed after idle'
+		time.sleep(.05)
+
+	writer.close()
@@ -1,4 +1,9 @@
 import logging
+import json
+
+import pytest
+
+from snakemake_interface_logger_plugins.common import LogEvent
 
 from snakemake_logger_plugin_json import models
 
@@ -19,3 +24,62 @@ def test_builtin_conversion(example_records: list[models.JsonLogRecord]):
 		assert type(json_record2) is model
 
 		assert json_record2 == json_record
+
+
+def test_builtin_string_event():
+	"""Test builtin records with a plain string "event" attribute are treated as standard records."""
+
+	for event in [str(LogEvent.ERROR), 'foo', ['unhashable']]:
+		builtin_record = logging.makeLogRecord(dict(msg='test', message='test', event=event))
+		json_record = models.JsonLogRecord.from_builtin(builtin_record)
+		assert type(json_record) is models.StandardLogRecord
+		assert json_record.message == 'test'
+
+
+class CustomError(Exception):
+	pass
+
+
+def test_exception_info():
+	"""Test ExceptionInfo.from_exception()."""
+
+	info = models.ExceptionInfo.from_exception(KeyError('foo'))
+	assert info.type == 'KeyError'
+	assert info.message == str(KeyError('foo'))
+
+	info = models.ExceptionInfo.from_exception(CustomError('bar'))
+	assert info.type == f'{__name__}.CustomError'
+	assert info.message == 'bar'
+
+	# Cached value
+	assert models.ExceptionInfo.from_exception(CustomError()).type == f'{__name__}.CustomError'
+
+
+def test_unregistered_model():
+	"""Test a model created with ``snakemake_model(register=False)`` is set up fully."""
+
+	@models.snakemake_model(register=False)
+	class CustomRecord(models.SnakemakeLogRecord):
+		event = LogEvent.ERROR
+		foo: int = 0
+
+	assert models.SNAKEMAKE_RECORD_MODELS[LogEvent.ERROR] is not CustomRecord
+
+	record = CustomRecord(message='test', levelno=logging.INFO, created=0., foo=3)
+
+	data = json.loads(models.adapter_cache.dump_json(record))
+	assert data['type'] == 'snakemake'
+	assert data['event'] == str(LogEvent.ERROR)
+	assert data['foo'] == 3
+	assert record.to_dict() == data
+
+	builtin_record = record.to_builtin()
+	assert CustomRecord._from_builtin(builtin_record, validate=True) == record
+	assert CustomRecord._from_builtin(builtin_record, validate=False) == record
+
+
+def test_all_models_deprecated():
+	"""Test the deprecated ALL_MODELS module attribute."""
+
+	with pytest.warns(DeprecationWarning):
+		assert models.ALL_MODELS == models.all_models()
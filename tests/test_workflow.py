@@ -7,13 +7,14 @@ from warnings import warn
 import pytest
 
 from snakemake_logger_plugin_json.json import parse_logfile
-from snakemake_logger_plugin_json.models import ALL_MODELS, LoggingStartedRecord, LoggingFinishedRecord
+from snakemake_logger_plugin_json.models import all_models, LoggingStartedRecord, LoggingFinishedRecord
 
 
 TEST_DIR = Path(__file__).parent
 
 
-def test_run_workflow(tmp_path: Path):
+@pytest.mark.parametrize('validate', [False, True])
+def test_run_workflow(tmp_path: Path, validate: bool):
 	"""Test running the example workflow with the logger and parsing the output."""
 
 	workdir = tmp_path / 'workdir'
@@ -29,15 +30,16 @@ def test_run_workflow(tmp_path: Path):
 		'--keep-going',
 		'--logger', 'json',
 		'--logger-json-file', str(logfile.absolute()),
-		'--logger-json-validate',
 		'--logger-json-rulegraph',
 	]
+	if validate:
+		cmd.append('--logger-json-validate')
 	run(cmd)
 	assert logfile.is_file()
 
 	# Parse
 	with open(logfile) as fh:
-		records = list(parse_logfile(fh))
+		records = list(parse_logfile(fh, strict=True))
 
 	assert isinstance(records[0], LoggingStartedRecord)
 	assert isinstance(records[-1], LoggingFinishedRecord)
@@ -45,7 +47,7 @@ def test_run_workflow(tmp_path: Path):
 	# Ideally we'd like to generate and test all types of record. Add a warning about record types
 	# which were not generated.
 	seen_types = {type(record) for record in records}
-	missing_types = set(ALL_MODELS) - seen_types
+	missing_types = set(all_models()) - seen_types
 	if missing_types:
 		names = ', '.join(sorted(typ.__name__ for typ in missing_types))
 		warn(f'The following record types were not generated: {names}')